@@ -0,0 +1,210 @@
+import os
+import asyncio
+import httpx
+import pandas as pd
+from openai import AsyncOpenAI
+from typing import (AsyncIterable,
+                    AsyncIterator,
+                    Iterable,
+                    Optional,
+                    Union)
+from scraper import async_firecrawl_scraper
+from utility import single_to_dataframe
+from extractor import (async_extract_info,
+                       enhanced_json_extractor)
+
+# Marks the end of the url stream for a worker / the end of the results for the consumer
+_DONE = object()
+
+
+async def _iterate(urls: Union[Iterable[str], AsyncIterable[str]]):
+    """
+    Iterate over a plain or an async iterable of urls.
+    """
+    if hasattr(urls, '__aiter__'):
+        async for url in urls:
+            yield url
+    else:
+        for url in urls:
+            yield url
+
+
+async def process_website(url: str,
+                          prompt: str,
+                          http_client: Optional[httpx.AsyncClient] = None,
+                          openai_client: Optional[AsyncOpenAI] = None):
+    """
+    Scrape a single website and extract information from it.
+
+    Args:
+        url (str): Website to scrape
+        prompt (str): Prompt for extracting information
+        http_client (httpx.AsyncClient, optional): Client used to call Firecrawl
+        openai_client (AsyncOpenAI, optional): Client used for the extraction
+
+    Returns:
+        dict: {'source': url, 'result': enhanced_json_extractor output, 'error': None}
+    """
+    scraped_content = await async_firecrawl_scraper(url, client=http_client)
+    extracted_info = await async_extract_info(scraped_content, prompt, openai_client=openai_client)
+    return {
+        'source': url,
+        'result': enhanced_json_extractor(extracted_info),
+        'error': None,
+    }
+
+
+async def run(urls: Union[Iterable[str], AsyncIterable[str]],
+              prompt: str,
+              concurrency: int = 100,
+              buffer_size: Optional[int] = None,
+              http_client: Optional[httpx.AsyncClient] = None,
+              openai_client: Optional[AsyncOpenAI] = None,
+              timeout: float = 60.0) -> AsyncIterator[dict]:
+    """
+    Scrape websites and extract information concurrently, yielding results as they complete.
+
+    At most `concurrency` websites are in flight at once, all on the running event loop.
+    Finished results wait in a buffer of `buffer_size` items; once it is full the workers
+    stop picking up new urls until the caller consumes more, so a slow consumer slows the
+    scraping down instead of piling up results in memory.
+
+    Breaking out of the loop, closing the iterator or cancelling the consuming task cancels
+    every website still in flight. If the url iterable raises, the urls it already produced
+    are still processed and yielded before the error is re-raised to the caller.
+    Use `contextlib.aclosing` to close it deterministically:
+
+        async with aclosing(run(urls, prompt)) as results:
+            async for item in results:
+                ...
+
+    Args:
+        urls: Plain or async iterable of website urls, consumed lazily
+        prompt (str): Prompt for extracting information
+        concurrency (int, optional): Maximum number of websites processed at once
+        buffer_size (int, optional): Maximum number of finished results waiting to be consumed, defaults to `concurrency`
+        http_client (httpx.AsyncClient, optional): Client used to call Firecrawl, created (and closed) here if not given
+        openai_client (AsyncOpenAI, optional): Client used for the extraction, created (and closed) here if not given
+        timeout (float, optional): Timeout in seconds for the Firecrawl requests when the http client is created here
+
+    Yields:
+        dict: {'source': url, 'result': enhanced_json_extractor output or None, 'error': error message or None}
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    owns_http_client = http_client is None
+    if owns_http_client:
+        http_client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+    # Both clients are created per run, their connection pools are bound to the running event loop
+    owns_openai_client = openai_client is None
+    if owns_openai_client:
+        openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    pending = asyncio.Queue(maxsize=concurrency)
+    results = asyncio.Queue(maxsize=buffer_size or concurrency)
+
+    async def worker():
+        while True:
+            url = await pending.get()
+            if url is _DONE:
+                return
+            try:
+                item = await process_website(url, prompt, http_client, openai_client)
+            except Exception as e:
+                item = {'source': url, 'result': None, 'error': str(e) or repr(e)}
+            await results.put(item)
+
+    async def produce():
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        error = None
+        try:
+            try:
+                async for url in _iterate(urls):
+                    await pending.put(url)
+            except Exception as e:
+                # Still finish the urls already taken from the iterable, then re-raise
+                error = e
+            for _ in workers:
+                await pending.put(_DONE)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        if error is not None:
+            raise error
+
+    async def supervise():
+        # Only signal the end when not cancelled, a cancelled run has no consumer left
+        try:
+            await produce()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await results.put(_DONE)
+            raise
+        await results.put(_DONE)
+
+    producer = asyncio.create_task(supervise())
+    try:
+        while True:
+            item = await results.get()
+            if item is _DONE:
+                # Re-raises an error from the url iterable, if any
+                await producer
+                return
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        if owns_http_client:
+            await http_client.aclose()
+        if owns_openai_client:
+            await openai_client.close()
+
+
+async def run_to_dataframe(urls: Union[Iterable[str], AsyncIterable[str]],
+                           prompt: str,
+                           output_path: Optional[str] = None,
+                           **kwargs):
+    """
+    Async counterpart of main.main for a known list of urls.
+
+    Args:
+        urls: Plain or async iterable of website urls
+        prompt (str): Prompt for extracting information
+        output_path (str, optional): Path to save the output CSV file, nothing is saved if not given
+        **kwargs: Passed on to run
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the combined results from all websites
+    """
+    frames = []
+    async for item in run(urls, prompt, **kwargs):
+        if item['error'] is not None:
+            print(f"Error processing website {item['source']}: {item['error']}")
+            continue
+
+        single_df = single_to_dataframe(item['result'])
+        if single_df is not None and not single_df.empty:
+            # Add source information
+            single_df['source'] = item['source']
+            frames.append(single_df)
+
+    # pd.concat aligns the columns, filling the missing ones with NaN
+    main_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    if output_path and not main_df.empty:
+        main_df.to_csv(output_path, index=False)
+
+    return main_df
+
+
+if __name__ == "__main__":
+    urls = ["https://www.10xgenomics.com/distributors"]
+    result_df = asyncio.run(run_to_dataframe(urls, "帮我抓取company 还有email"))
+    print(result_df)
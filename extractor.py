@@ -3,7 +3,8 @@ import re
 import os
 import json
 from typing import List
-from openai import OpenAI
+from openai import (OpenAI,
+                    AsyncOpenAI)
 from dotenv import load_dotenv
 from pydantic import (BaseModel,
                       Field)
@@ -11,6 +12,28 @@ load_dotenv(override=True)
 # Initialize the OpenAI client
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+def build_messages(text: str,
+                   prompt: str):
+    """
+    Build the chat messages shared by extract_info and async_extract_info.
+    """
+    return [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant specialized in extracting info from text and return in json format"
+        },
+        {"role": "user", "content": f""" 
+            {prompt}
+            ------------
+            text:
+            {text}
+
+            -------------------------
+            * Only return json format
+            -------------------------
+            """}
+    ]
+
 def extract_info(text: str,
                  prompt: str):
     """
@@ -24,27 +47,43 @@ def extract_info(text: str,
     """
     completion = client.beta.chat.completions.parse(
         model="gpt-4o-mini-2024-07-18",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a helpful assistant specialized in extracting info from text and return in json format"
-            },
-            {"role": "user", "content": f""" 
-            {prompt}
-            ------------
-            text:
-            {text}
-
-            -------------------------
-            * Only return json format
-            -------------------------
-            """}
-        ],
+        messages=build_messages(text, prompt),
     )
     
     return completion.choices[0].message.content
 
 
+async def async_extract_info(text: str,
+                             prompt: str,
+                             openai_client: AsyncOpenAI = None):
+    """
+    Async version of extract_info using the AsyncOpenAI client.
+    
+    Args:
+        text (str): Scraped text to extract information from
+        prompt (str): Prompt describing the information to extract
+        openai_client (AsyncOpenAI, optional): Client to use, created (and closed) here if not given
+        
+    Returns:
+        The raw model response content
+    """
+    # Async clients are bound to the event loop that first uses them, so none is shared globally
+    owns_client = openai_client is None
+    if owns_client:
+        openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    
+    try:
+        completion = await openai_client.beta.chat.completions.parse(
+            model="gpt-4o-mini-2024-07-18",
+            messages=build_messages(text, prompt),
+        )
+    finally:
+        if owns_client:
+            await openai_client.close()
+    
+    return completion.choices[0].message.content
+
+
 def enhanced_json_extractor(input_data):
     """
     n8n增强型JSON提取器 - 处理各种JSON格式并提供多种输出选项
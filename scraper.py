@@ -1,4 +1,5 @@
 import os 
+import httpx
 from dotenv import load_dotenv
 from firecrawl import FirecrawlApp
 from typing import List, Optional, Any
@@ -14,6 +15,48 @@ def firecrawl_scraper(url: str):
     )
     return response['markdown']
 
+async def async_firecrawl_scraper(url: str,
+                                  client: Optional[httpx.AsyncClient] = None,
+                                  api_url: Optional[str] = None):
+    """
+    Scrape a url to markdown through the Firecrawl REST API without blocking the event loop.
+    
+    Args:
+        url (str): Website to scrape
+        client (httpx.AsyncClient, optional): Shared client, so many pages can be in flight over one connection pool
+        api_url (str, optional): Firecrawl base url, defaults to the Firecrawl_api_url env var or the hosted API
+        
+    Returns:
+        str: The scraped page in markdown
+    """
+    api_url = api_url or os.getenv('Firecrawl_api_url', 'https://api.firecrawl.dev')
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(timeout=60.0)
+    
+    try:
+        response = await client.post(
+            f"{api_url.rstrip('/')}/v1/scrape",
+            headers={'Authorization': f"Bearer {os.getenv('Firecrawl_api_key')}"},
+            json={
+                'url': url,
+                'formats': ['markdown'],
+            }
+        )
+    finally:
+        if owns_client:
+            await client.aclose()
+    
+    # Read the body before checking the status, Firecrawl explains its 4xx/5xx errors in it
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+    if response.is_error or not body.get('success'):
+        error = body.get('error') or f"HTTP {response.status_code} {response.reason_phrase}"
+        raise Exception(f"Failed to scrape {url}: {error}")
+    return body['data']['markdown']
+
 if __name__ == "__main__":
     url = "https://www.10xgenomics.com/distributors"
     result = firecrawl_scraper(url)
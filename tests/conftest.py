@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# extractor creates its sync OpenAI client at import time, which needs a key
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
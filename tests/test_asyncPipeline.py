@@ -0,0 +1,237 @@
+import json
+import asyncio
+import httpx
+import pytest
+from contextlib import aclosing
+from openai import AsyncOpenAI
+import asyncPipeline
+
+# Kept before any test patches httpx.AsyncClient
+RealAsyncClient = httpx.AsyncClient
+
+
+class FakeFirecrawl:
+    """
+    Fake Firecrawl /v1/scrape endpoint that records how many requests are in flight.
+    """
+    def __init__(self, delay=0.01, failing=()):
+        self.delay = delay
+        self.failing = set(failing)
+        self.started = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handler(self, request):
+        url = json.loads(request.content)['url']
+        self.started += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if url in self.failing:
+            return httpx.Response(500, json={'success': False, 'error': 'boom'})
+        return httpx.Response(200, json={'success': True, 'data': {'markdown': f"page {url}"}})
+
+    def client(self):
+        return RealAsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def fake_openai_handler(request):
+    """
+    Fake chat completions endpoint answering with the url found in the scraped page.
+    """
+    user_message = json.loads(request.content)['messages'][1]['content']
+    url = user_message.split('page ')[1].split()[0]
+    return httpx.Response(200, json={
+        'id': 'chatcmpl-test',
+        'object': 'chat.completion',
+        'created': 0,
+        'model': 'gpt-4o-mini-2024-07-18',
+        'choices': [{
+            'index': 0,
+            'finish_reason': 'stop',
+            'message': {'role': 'assistant', 'content': json.dumps({'items': [{'Name': url}]})},
+        }],
+    })
+
+
+def fake_openai():
+    return AsyncOpenAI(
+        api_key='test-key',
+        base_url='http://openai.test/v1',
+        http_client=RealAsyncClient(transport=httpx.MockTransport(fake_openai_handler)),
+    )
+
+
+def stray_tasks():
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+@pytest.fixture
+def owned_clients(monkeypatch):
+    """
+    Let run() create its own clients, backed by the fakes, and record them.
+    """
+    firecrawl = FakeFirecrawl(delay=0.05)
+    # Built before the patch, AsyncOpenAI checks its http client against httpx.AsyncClient
+    created = {'openai': fake_openai()}
+
+    class RecordingAsyncClient(RealAsyncClient):
+        def __init__(self, **kwargs):
+            kwargs['transport'] = httpx.MockTransport(firecrawl.handler)
+            super().__init__(**kwargs)
+            created['http'] = self
+
+    def recording_openai(**kwargs):
+        return created['openai']
+
+    monkeypatch.setattr(asyncPipeline.httpx, 'AsyncClient', RecordingAsyncClient)
+    monkeypatch.setattr(asyncPipeline, 'AsyncOpenAI', recording_openai)
+    return firecrawl, created
+
+
+def test_run_respects_concurrency():
+    firecrawl = FakeFirecrawl()
+    urls = [f"http://s/{i}" for i in range(300)]
+
+    async def scenario():
+        async with firecrawl.client() as http_client:
+            return [item async for item in asyncPipeline.run(urls, 'prompt',
+                                                             concurrency=50,
+                                                             http_client=http_client,
+                                                             openai_client=fake_openai())]
+
+    items = asyncio.run(scenario())
+
+    assert sorted(item['source'] for item in items) == sorted(urls)
+    assert all(item['error'] is None for item in items)
+    assert items[0]['result'][0]['json']['result']['data'] == [{'Name': items[0]['source']}]
+    assert 1 < firecrawl.peak <= 50
+
+
+def test_run_reports_scrape_errors_and_continues():
+    firecrawl = FakeFirecrawl(failing={'http://s/3'})
+    urls = [f"http://s/{i}" for i in range(20)]
+
+    async def scenario():
+        async with firecrawl.client() as http_client:
+            return [item async for item in asyncPipeline.run(urls, 'prompt',
+                                                             concurrency=5,
+                                                             http_client=http_client,
+                                                             openai_client=fake_openai())]
+
+    items = asyncio.run(scenario())
+    errors = [item for item in items if item['error'] is not None]
+
+    assert len(items) == 20
+    assert [item['source'] for item in errors] == ['http://s/3']
+    assert 'boom' in errors[0]['error']
+    assert errors[0]['result'] is None
+
+
+def test_run_stops_fetching_when_consumer_does_not_read():
+    firecrawl = FakeFirecrawl(delay=0)
+    urls = [f"http://s/{i}" for i in range(100)]
+
+    async def scenario():
+        async with firecrawl.client() as http_client:
+            results = asyncPipeline.run(urls, 'prompt',
+                                        concurrency=4,
+                                        buffer_size=2,
+                                        http_client=http_client,
+                                        openai_client=fake_openai())
+            async with aclosing(results):
+                await results.__anext__()
+                await asyncio.sleep(0.2)
+                started = firecrawl.started
+                await asyncio.sleep(0.2)
+                return started, firecrawl.started
+
+    started, started_later = asyncio.run(scenario())
+
+    # One consumed item, a full buffer and one finished item per blocked worker
+    assert started <= 1 + 2 + 4
+    assert started_later == started
+
+
+def test_run_aclose_cleans_up(owned_clients):
+    firecrawl, created = owned_clients
+    urls = [f"http://s/{i}" for i in range(100)]
+
+    async def scenario():
+        async with aclosing(asyncPipeline.run(urls, 'prompt', concurrency=10)) as results:
+            async for _ in results:
+                break
+        return stray_tasks()
+
+    assert asyncio.run(scenario()) == []
+    assert created['http'].is_closed
+    assert created['openai'].is_closed()
+
+
+def test_run_cancel_cleans_up(owned_clients):
+    firecrawl, created = owned_clients
+    urls = [f"http://s/{i}" for i in range(100)]
+
+    async def scenario():
+        async def consume():
+            async for _ in asyncPipeline.run(urls, 'prompt', concurrency=10):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        assert firecrawl.in_flight > 0
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return stray_tasks()
+
+    assert asyncio.run(scenario()) == []
+    assert firecrawl.in_flight == 0
+    assert created['http'].is_closed
+    assert created['openai'].is_closed()
+
+
+def test_run_reraises_url_iterable_errors():
+    firecrawl = FakeFirecrawl()
+
+    def bad_urls():
+        yield 'http://s/1'
+        raise RuntimeError('bad url source')
+
+    async def scenario(items):
+        async with firecrawl.client() as http_client:
+            async for item in asyncPipeline.run(bad_urls(), 'prompt',
+                                                http_client=http_client,
+                                                openai_client=fake_openai()):
+                items.append(item)
+
+    items = []
+    with pytest.raises(RuntimeError, match='bad url source'):
+        asyncio.run(scenario(items))
+
+    # The url taken before the error is still processed
+    assert [item['source'] for item in items] == ['http://s/1']
+    assert items[0]['error'] is None
+
+
+def test_run_to_dataframe_adds_source():
+    firecrawl = FakeFirecrawl()
+
+    async def urls():
+        for i in range(3):
+            yield f"http://s/{i}"
+
+    async def scenario():
+        async with firecrawl.client() as http_client:
+            return await asyncPipeline.run_to_dataframe(urls(), 'prompt',
+                                                        http_client=http_client,
+                                                        openai_client=fake_openai())
+
+    df = asyncio.run(scenario())
+
+    assert list(df.columns) == ['name', 'source']
+    assert sorted(df['name']) == sorted(df['source']) == ['http://s/0', 'http://s/1', 'http://s/2']